@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+
+def unique_temp_path(path):
+    """Create an empty temp file next to ``path`` with a name unique to this call.
+
+    Names come from mkstemp, so threads sharing a PID (Streamlit sessions)
+    never write to the same temp file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                               prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    return tmp
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def replace_atomic(path, write):
+    """Call ``write(tmp_path)``, then swap the temp file into ``path`` with os.replace."""
+    tmp = unique_temp_path(path)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        remove_quietly(tmp)
+        raise
+
+
+def write_text_atomic(path, text):
+    def write(tmp):
+        with open(tmp, "w", newline="") as f:
+            f.write(text)
+    replace_atomic(path, write)
@@ -7,7 +7,10 @@ import plotly.graph_objects as go
 import joblib
 import urllib.request
 import tempfile
+import time
 import warnings
+from risk_cache import MODEL_FEATURES, risk_band, load_risk_scores, data_version, high_risk_rate
+from model_registry import ModelRegistry, shadow_compare
 warnings.filterwarnings('ignore')
 
 # Configure page
@@ -178,28 +181,78 @@ def load_insights_data():
         return None
 
 # ----------------------------
-# Load model (binary pickle)
+# Load model (local registry)
 # ----------------------------
-@st.cache_resource
-def load_model():
-    """Load the trained pipeline model from GitHub repo."""
+MODEL_URL = "https://raw.githubusercontent.com/kaizen105/Diabetes-analysis-project/8eb4417d802bb66a0c8efff44f56a593d5b4ae15/notebook/diabetes_readmission.pkl"
+registry = ModelRegistry()
+
+SEED_RETRY_SECONDS = 300
+
+def fetch_published_model():
+    """Download the published GitHub pickle."""
+    # Download to a temporary file
+    tmp = tempfile.NamedTemporaryFile(delete=False)
+    tmp.close()
     try:
-        url = "https://raw.githubusercontent.com/kaizen105/Diabetes-analysis-project/8eb4417d802bb66a0c8efff44f56a593d5b4ae15/notebook/diabetes_readmission.pkl"
-        
-        # Download to a temporary file
-        tmp = tempfile.NamedTemporaryFile(delete=False)
-        urllib.request.urlretrieve(url, tmp.name)
-        
-        model = joblib.load(tmp.name)
+        urllib.request.urlretrieve(MODEL_URL, tmp.name)
+        return joblib.load(tmp.name)
+    finally:
         os.unlink(tmp.name)  # cleanup temp file
 
-        if not hasattr(model, "predict"):
-            st.error("❌ Loaded object is not a valid model.")
-            return None
-        return model
+@st.cache_resource
+def seed_state():
+    """Per-process record of the last failed seed attempt, used to rate-limit retries."""
+    return {"failed_at": 0.0, "error": None}
+
+def live_model_version():
+    """Version currently promoted in the registry; re-read on every run so promotions apply without a restart.
+
+    An empty registry is seeded once from the published GitHub pickle; a failed
+    download is retried at most every SEED_RETRY_SECONDS.
+    """
+    version = registry.live_version()
+    if version is not None:
+        return version
+
+    state = seed_state()
+    if time.time() - state["failed_at"] < SEED_RETRY_SECONDS:
+        st.error(f"❌ Error loading model: {state['error']}")
+        return None
+    try:
+        version = registry.seed(fetch_published_model, metadata={"source": MODEL_URL, "note": "seeded from GitHub"})
     except Exception as e:
+        state.update(failed_at=time.time(), error=e)
         st.error(f"❌ Error loading model: {e}")
         return None
+    if version is None:
+        st.info("⏳ The model is being set up by another worker, please refresh shortly.")
+    return version
+
+@st.cache_resource(max_entries=4)
+def load_model_version(version):
+    """Load a registry version with its arrays memory-mapped, so app workers share one copy."""
+    model = registry.load(version)
+    if not hasattr(model, "predict"):
+        raise TypeError(f"{version} is not a valid model.")
+    return model
+
+def load_live_model():
+    """Load the live pipeline model; returns (version, model), with model None on failure."""
+    version = live_model_version()
+    if version is None:
+        return None, None
+    try:
+        return version, load_model_version(version)
+    except Exception as e:
+        st.error(f"❌ Error loading model {version}: {e}")
+        return version, None
+
+RISK_COLORS = {"Low": "#27ae60", "Medium": "#f39c12", "High": "#e74c3c"}
+
+@st.cache_data
+def load_scored_insights(model_ver, data_ver, _model, _insights_df):
+    """Insights dataset with model risk scores, recomputed only when the model or data version changes."""
+    return load_risk_scores(_model, _insights_df, model_ver=model_ver, data_ver=data_ver)
 
 # Main content based on selected page
 query_params = st.query_params
@@ -312,7 +365,7 @@ elif page == 'Prediction':
     """, unsafe_allow_html=True)
 
     model_df = load_model_data()
-    model = load_model()
+    live_version, model = load_live_model()
 
     if model_df is None or model is None:
         st.stop()
@@ -343,29 +396,8 @@ elif page == 'Prediction':
         predict_button = st.form_submit_button("🔍 Predict Readmission Risk", type="primary")
 
     if predict_button:
-        all_columns = [
-            'gender', 'age', 'time_in_hospital', 'num_lab_procedures', 'num_procedures',
-            'num_medications', 'number_diagnoses', 'total_visits', 'race_Asian',
-            'race_Caucasian', 'race_Hispanic', 'race_Other', 'admission_type_id_Emergency',
-            'admission_type_id_Not Available', 'discharge_disposition_id_Left AMA',
-            'discharge_disposition_id_Not Available', 'discharge_disposition_id_Still patient/referred to this institution',
-            'discharge_disposition_id_Transferred to another facility', 'admission_source_id_Not Available',
-            'admission_source_id_Referral', 'admission_source_id_Transferred from hospital',
-            'payer_code_CH', 'payer_code_CM', 'payer_code_CP', 'payer_code_DM', 'payer_code_FR',
-            'payer_code_HM', 'payer_code_MC', 'payer_code_MD', 'payer_code_MP', 'payer_code_OG',
-            'payer_code_OT', 'payer_code_Other', 'payer_code_PO', 'payer_code_SI', 'payer_code_SP',
-            'payer_code_UN', 'payer_code_WC', 'insulin_No', 'insulin_Steady', 'insulin_Up',
-            'change_No', 'diabetesMed_Yes', 'diag_1_Diabetes', 'diag_1_Digestive',
-            'diag_1_Genitourinary', 'diag_1_Injury', 'diag_1_Musculoskeletal', 'diag_1_Neoplasms',
-            'diag_1_Other', 'diag_1_Respiratory', 'diag_1_Unknown', 'diag_2_Diabetes',
-            'diag_2_Digestive', 'diag_2_Genitourinary', 'diag_2_Injury', 'diag_2_Musculoskeletal',
-            'diag_2_Neoplasms', 'diag_2_Other', 'diag_2_Respiratory', 'diag_2_Unknown',
-            'diag_3_Diabetes', 'diag_3_Digestive', 'diag_3_Genitourinary', 'diag_3_Injury',
-            'diag_3_Musculoskeletal', 'diag_3_Neoplasms', 'diag_3_Other', 'diag_3_Respiratory',
-            'diag_3_Unknown'
-        ]
         
-        patient = {col: False for col in all_columns}
+        patient = {col: False for col in MODEL_FEATURES}
         
         patient['gender'] = gender_code
         patient['age'] = age
@@ -413,21 +445,9 @@ elif page == 'Prediction':
                 st.error(f"Prediction error: {e}")
                 st.stop()
             
-            risk_level = "Low"
-            risk_class = "low-risk"
-            color = "#27ae60"
-            if probability < 0.3:
-                risk_level = "Low"
-                risk_class = "low-risk"
-                color = "#27ae60"
-            elif probability < 0.7:
-                risk_level = "Medium"
-                risk_class = "medium-risk"
-                color = "#f39c12"
-            else:
-                risk_level = "High"
-                risk_class = "high-risk"
-                color = "#e74c3c"
+            risk_level = risk_band(probability)
+            risk_class = f"{risk_level.lower()}-risk"
+            color = RISK_COLORS[risk_level]
 
             st.markdown(f"""
             <div class="prediction-result {risk_class}">
@@ -437,6 +457,19 @@ elif page == 'Prediction':
             </div>
             """, unsafe_allow_html=True)
 
+            shadow_version = registry.shadow_version()
+            if shadow_version and shadow_version != live_version:
+                try:
+                    comparison = shadow_compare(load_model_version(shadow_version), patient_df,
+                                                [probability], live_version, shadow_version)
+                    registry.log_shadow(comparison)
+                    with st.expander(f"🧪 Shadow model {shadow_version}"):
+                        st.write(f"Candidate probability: {comparison['shadow_probability'][0]*100:.1f}% "
+                                 f"({comparison['difference'][0]*100:+.1f} pts vs live, "
+                                 f"{risk_band(comparison['shadow_probability'][0])} Risk)")
+                except Exception as e:
+                    st.warning(f"Shadow scoring error: {e}")
+
             st.subheader("📋 Clinical Recommendations")
             if probability > 0.6:
                 st.markdown("""
@@ -537,7 +570,58 @@ elif page == 'Insights':
                       title="Admission Type Distribution")
         fig6.update_traces(marker_color='#f39c12')
         st.plotly_chart(fig6, use_container_width=True)
-    
+
+    st.subheader("🎯 Model Risk Stratification")
+    live_version, model = load_live_model()
+    scored_df = None
+    if model is not None:
+        try:
+            model_ver = registry.metadata(live_version)['sha256'][:12]
+            scored_df = load_scored_insights(model_ver, data_version(insights_df), model, insights_df)
+        except Exception as e:
+            st.error(f"❌ Error scoring insights data: {e}")
+
+    if scored_df is None:
+        st.info("Risk stratification is unavailable because the model could not be loaded or scored.")
+    else:
+        band_counts = scored_df['risk_band'].value_counts().reindex(list(RISK_COLORS), fill_value=0)
+        col1, col2, col3 = st.columns(3)
+        for col, band in zip((col1, col2, col3), RISK_COLORS):
+            with col:
+                st.metric(f"{band} Risk Encounters", f"{band_counts[band]:,}",
+                          f"{band_counts[band] / len(scored_df) * 100:.1f}%", delta_color="off")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            fig7 = px.histogram(scored_df, x='risk_probability', color='risk_band',
+                                color_discrete_map=RISK_COLORS, nbins=50,
+                                title="Predicted Readmission Risk Distribution",
+                                labels={'risk_probability': 'Predicted Probability', 'risk_band': 'Risk Band'})
+            st.plotly_chart(fig7, use_container_width=True)
+
+        with col2:
+            age_risk = high_risk_rate(scored_df, 'age')
+            fig8 = px.bar(age_risk, x='age', y='high_risk_pct',
+                          title="High-Risk Share by Age Group",
+                          labels={'age': 'Age Group', 'high_risk_pct': 'High Risk (%)'})
+            fig8.update_traces(marker_color=RISK_COLORS["High"])
+            st.plotly_chart(fig8, use_container_width=True)
+
+        col1, col2, col3 = st.columns(3)
+
+        for col, (field, label) in zip((col1, col2, col3), [('admission_type_id', 'Admission Type'),
+                                                            ('insulin', 'Insulin Usage'),
+                                                            ('diag_1', 'Primary Diagnosis Group')]):
+            with col:
+                cohort_risk = high_risk_rate(scored_df, field).sort_values('high_risk_pct', ascending=False)
+                fig = px.bar(cohort_risk, x=field, y='high_risk_pct',
+                             hover_data=['encounters', 'mean_probability'],
+                             title=f"High-Risk Share by {label}",
+                             labels={field: label, 'high_risk_pct': 'High Risk (%)'})
+                fig.update_traces(marker_color=RISK_COLORS["High"])
+                st.plotly_chart(fig, use_container_width=True)
+
     st.subheader("🔍 Key Insights")
     
     insight_col1, insight_col2, insight_col3 = st.columns(3)
@@ -0,0 +1,257 @@
+import os
+import re
+import json
+import shutil
+import argparse
+import tempfile
+import hashlib
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import joblib
+from atomic_io import unique_temp_path, remove_quietly, write_text_atomic
+
+REGISTRY_DIR = os.environ.get(
+    "DIABETRACK_MODEL_REGISTRY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "model_registry")
+)
+MODEL_FILE = "model.joblib"
+METADATA_FILE = "metadata.json"
+RESERVED_METADATA = {"version", "created_at", "sha256", "metrics"}
+
+
+class ModelRegistry:
+    """Versioned model store on the local filesystem.
+
+    Layout::
+
+        <root>/versions/v1/model.joblib    # uncompressed so arrays can be memory-mapped
+        <root>/versions/v1/metadata.json   # version, created_at, sha256, metrics, extra metadata
+        <root>/LIVE                        # version served by the app
+        <root>/SHADOW                      # optional candidate scored alongside LIVE
+
+    Pointer files are replaced atomically, so app workers that re-read them on
+    every run switch to a promoted version without a restart.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = os.path.abspath(root)
+        self.versions_dir = os.path.join(self.root, "versions")
+
+    # ----------------------------
+    # Versions
+    # ----------------------------
+    def list_versions(self):
+        """Registered versions, oldest first."""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        versions = [v for v in os.listdir(self.versions_dir) if re.fullmatch(r"v\d+", v)]
+        return sorted(versions, key=lambda v: int(v[1:]))
+
+    def metadata(self, version):
+        with open(os.path.join(self.versions_dir, version, METADATA_FILE)) as f:
+            return json.load(f)
+
+    def register(self, model, metrics=None, metadata=None):
+        """Store a fitted model as the next version and return its name."""
+        reserved = RESERVED_METADATA.intersection(metadata or {})
+        if reserved:
+            raise ValueError(f"Metadata keys are set by the registry: {', '.join(sorted(reserved))}")
+        os.makedirs(self.versions_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.versions_dir)
+        try:
+            model_path = os.path.join(staging, MODEL_FILE)
+            joblib.dump(model, model_path)
+            with open(model_path, "rb") as f:
+                sha256 = hashlib.sha256(f.read()).hexdigest()
+            while True:
+                versions = self.list_versions()
+                version = f"v{int(versions[-1][1:]) + 1 if versions else 1}"
+                info = {
+                    "version": version,
+                    "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "sha256": sha256,
+                    "metrics": metrics or {},
+                    **(metadata or {}),
+                }
+                with open(os.path.join(staging, METADATA_FILE), "w") as f:
+                    json.dump(info, f, indent=2)
+                try:
+                    # rename fails if another process claimed this version first
+                    os.rename(staging, os.path.join(self.versions_dir, version))
+                    return version
+                except OSError:
+                    if not os.path.isdir(os.path.join(self.versions_dir, version)):
+                        raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def seed(self, fetch, metadata=None, stale_after=600):
+        """Register and promote ``fetch()`` as the first live version, once across processes.
+
+        A SEED.lock file created with O_EXCL makes exactly one worker do the
+        seeding; the others return ``None`` until the live pointer appears. A
+        lock older than ``stale_after`` seconds is treated as left behind by a
+        crashed worker and removed.
+        """
+        live = self.live_version()
+        if live is not None:
+            return live
+        os.makedirs(self.root, exist_ok=True)
+        lock = os.path.join(self.root, "SEED.lock")
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > stale_after:
+                    os.remove(lock)
+            except FileNotFoundError:
+                pass
+            return self.live_version()
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            if self.live_version() is None:
+                model = fetch()
+                if not hasattr(model, "predict"):
+                    raise TypeError("Seed object is not a valid model.")
+                self.promote(self.register(model, metadata=metadata))
+        finally:
+            os.close(fd)
+            os.remove(lock)
+        return self.live_version()
+
+    def load(self, version, mmap_mode="r"):
+        """Load a version; numpy arrays are memory-mapped and shared between processes."""
+        return joblib.load(os.path.join(self.versions_dir, version, MODEL_FILE), mmap_mode=mmap_mode)
+
+    # ----------------------------
+    # Live / shadow pointers
+    # ----------------------------
+    def _read_pointer(self, name):
+        try:
+            with open(os.path.join(self.root, name)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_pointer(self, name, version):
+        if version is not None and version not in self.list_versions():
+            raise ValueError(f"Unknown model version: {version}")
+        path = os.path.join(self.root, name)
+        if version is None:
+            remove_quietly(path)
+        else:
+            write_text_atomic(path, version)
+
+    def live_version(self):
+        return self._read_pointer("LIVE")
+
+    def shadow_version(self):
+        return self._read_pointer("SHADOW")
+
+    def promote(self, version):
+        """Make ``version`` live; clears the shadow pointer if it was the candidate."""
+        self._write_pointer("LIVE", version)
+        if self.shadow_version() == version:
+            self._write_pointer("SHADOW", None)
+
+    def set_shadow(self, version):
+        """Score ``version`` alongside the live model (``None`` disables shadowing)."""
+        self._write_pointer("SHADOW", version)
+
+    # ----------------------------
+    # Shadow scoring
+    # ----------------------------
+    def log_shadow(self, comparison):
+        """Append a shadow comparison frame to <root>/shadow_log.csv.
+
+        Safe with several app workers and sessions: the file is created together
+        with its header by hard-linking a uniquely named temp file, and each record
+        is a single os.write on an O_APPEND descriptor, so lines from different
+        processes or threads never interleave.
+        """
+        path = os.path.join(self.root, "shadow_log.csv")
+        if not os.path.exists(path):
+            tmp = unique_temp_path(path)
+            try:
+                with open(tmp, "w", newline="") as f:
+                    f.write(",".join(comparison.columns) + "\n")
+                os.link(tmp, path)
+            except FileExistsError:
+                pass
+            finally:
+                remove_quietly(tmp)
+
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        try:
+            for line in comparison.to_csv(index=False, header=False, lineterminator="\n").splitlines(keepends=True):
+                os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+
+def shadow_compare(shadow_model, X, live_probability, live_version=None, shadow_version=None):
+    """Score ``X`` with the shadow model next to the probabilities the live model already produced."""
+    live = np.asarray(live_probability, dtype="float64").reshape(-1)
+    shadow = shadow_model.predict_proba(X)[:, 1]
+    return pd.DataFrame({
+        "scored_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "live_version": live_version,
+        "shadow_version": shadow_version,
+        "live_probability": live,
+        "shadow_probability": shadow,
+        "difference": shadow - live,
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local DiabeTrack model registry.")
+    parser.add_argument("--root", default=REGISTRY_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    reg = sub.add_parser("register", help="register a pickled/joblib model")
+    reg.add_argument("model")
+    reg.add_argument("--metrics", help="evaluation report JSON (from notebook/Evaluate.py)")
+    reg.add_argument("--note", default="")
+    reg.add_argument("--promote", action="store_true")
+    reg.add_argument("--shadow", action="store_true")
+
+    sub.add_parser("list", help="list versions")
+    promote = sub.add_parser("promote", help="make a version live")
+    promote.add_argument("version")
+    shadow = sub.add_parser("shadow", help="shadow-score a version ('none' to disable)")
+    shadow.add_argument("version")
+
+    args = parser.parse_args(argv)
+    registry = ModelRegistry(args.root)
+
+    if args.command == "register":
+        metrics = None
+        if args.metrics:
+            with open(args.metrics) as f:
+                metrics = json.load(f).get("metrics", {})
+        version = registry.register(joblib.load(args.model), metrics=metrics,
+                                    metadata={"source": os.path.abspath(args.model), "note": args.note})
+        if args.promote:
+            registry.promote(version)
+        elif args.shadow:
+            registry.set_shadow(version)
+        print(version)
+    elif args.command == "list":
+        live, shadow = registry.live_version(), registry.shadow_version()
+        for version in registry.list_versions():
+            info = registry.metadata(version)
+            tag = " (live)" if version == live else " (shadow)" if version == shadow else ""
+            auc = info["metrics"].get("auc")
+            auc = f"  auc={auc:.3f}" if isinstance(auc, (int, float)) else ""
+            print(f"{version}{tag}  {info['created_at']}{auc}  {info.get('note', '')}")
+    elif args.command == "promote":
+        registry.promote(args.version)
+    elif args.command == "shadow":
+        registry.set_shadow(None if args.version.lower() == "none" else args.version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import os
+import glob
+import hashlib
+import pickle
+import numpy as np
+import pandas as pd
+from atomic_io import replace_atomic, remove_quietly
+
+# Features the deployed pipeline was trained on (diabetes_data_ml.csv minus the target)
+MODEL_FEATURES = [
+    'gender', 'age', 'time_in_hospital', 'num_lab_procedures', 'num_procedures',
+    'num_medications', 'number_diagnoses', 'total_visits', 'race_Asian',
+    'race_Caucasian', 'race_Hispanic', 'race_Other', 'admission_type_id_Emergency',
+    'admission_type_id_Not Available', 'discharge_disposition_id_Left AMA',
+    'discharge_disposition_id_Not Available', 'discharge_disposition_id_Still patient/referred to this institution',
+    'discharge_disposition_id_Transferred to another facility', 'admission_source_id_Not Available',
+    'admission_source_id_Referral', 'admission_source_id_Transferred from hospital',
+    'payer_code_CH', 'payer_code_CM', 'payer_code_CP', 'payer_code_DM', 'payer_code_FR',
+    'payer_code_HM', 'payer_code_MC', 'payer_code_MD', 'payer_code_MP', 'payer_code_OG',
+    'payer_code_OT', 'payer_code_Other', 'payer_code_PO', 'payer_code_SI', 'payer_code_SP',
+    'payer_code_UN', 'payer_code_WC', 'insulin_No', 'insulin_Steady', 'insulin_Up',
+    'change_No', 'diabetesMed_Yes', 'diag_1_Diabetes', 'diag_1_Digestive',
+    'diag_1_Genitourinary', 'diag_1_Injury', 'diag_1_Musculoskeletal', 'diag_1_Neoplasms',
+    'diag_1_Other', 'diag_1_Respiratory', 'diag_1_Unknown', 'diag_2_Diabetes',
+    'diag_2_Digestive', 'diag_2_Genitourinary', 'diag_2_Injury', 'diag_2_Musculoskeletal',
+    'diag_2_Neoplasms', 'diag_2_Other', 'diag_2_Respiratory', 'diag_2_Unknown',
+    'diag_3_Diabetes', 'diag_3_Digestive', 'diag_3_Genitourinary', 'diag_3_Injury',
+    'diag_3_Musculoskeletal', 'diag_3_Neoplasms', 'diag_3_Other', 'diag_3_Respiratory',
+    'diag_3_Unknown'
+]
+
+# Same encoding as diabetesproject.ipynb used to build diabetes_data_ml.csv
+AGE_MIDPOINTS = {
+    '[0-10)': 5, '[10-20)': 15, '[20-30)': 25, '[30-40)': 35, '[40-50)': 45,
+    '[50-60)': 55, '[60-70)': 65, '[70-80)': 75, '[80-90)': 85, '[90-100)': 95
+}
+DUMMY_COLUMNS = ['race', 'admission_type_id', 'discharge_disposition_id', 'admission_source_id',
+                 'payer_code', 'insulin', 'change', 'diabetesMed', 'diag_1', 'diag_2', 'diag_3']
+
+# Risk bands shown on the Prediction page: Low < 0.3 <= Medium < 0.7 <= High
+RISK_BANDS = ["Low", "Medium", "High"]
+RISK_CUTOFFS = [0.3, 0.7]
+
+CACHE_DIR = os.environ.get(
+    "DIABETRACK_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".risk_cache")
+)
+
+
+def risk_band(probability):
+    """Map a readmission probability to its Low/Medium/High band."""
+    return RISK_BANDS[int(np.searchsorted(RISK_CUTOFFS, probability, side="right"))]
+
+
+def encode_features(insights_df):
+    """Encode rows of diabetic_data_clean.csv into the model's feature matrix."""
+    X = insights_df.drop(columns=['encounter_id', 'patient_nbr', 'readmitted'], errors='ignore').copy()
+    X['age'] = X['age'].map(AGE_MIDPOINTS)
+    X['gender'] = (X['gender'] == 'Male').astype('int64')
+    X = pd.get_dummies(X, columns=[c for c in DUMMY_COLUMNS if c in X.columns])
+    # Reindexing drops the baseline level of each dummy, matching drop_first=True
+    X = X.reindex(columns=MODEL_FEATURES, fill_value=0)
+    return X.astype('float64')
+
+
+def model_version(model):
+    """Short content hash identifying a fitted model."""
+    return hashlib.sha256(pickle.dumps(model)).hexdigest()[:12]
+
+
+def row_hashes(df):
+    """Per-row content hash (as int64 so it round-trips through CSV)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy().view('int64')
+
+
+def data_version(df):
+    """Short content hash identifying a dataset."""
+    return hashlib.sha256(row_hashes(df).tobytes()).hexdigest()[:12]
+
+
+def score_encounters(model, insights_df):
+    """Return encounter_id, probability and risk band for every row."""
+    probability = model.predict_proba(encode_features(insights_df))[:, 1]
+    band_idx = np.searchsorted(RISK_CUTOFFS, probability, side="right")
+    return pd.DataFrame({
+        'encounter_id': insights_df['encounter_id'].to_numpy(),
+        'risk_probability': probability,
+        'risk_band': np.asarray(RISK_BANDS)[band_idx],
+    })
+
+
+def _read_cache(path):
+    try:
+        return pd.read_csv(path)
+    except FileNotFoundError:
+        # Removed by another writer that just stored a newer data version
+        return None
+
+
+def _mtime_or_zero(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+
+def load_risk_scores(model, insights_df, cache_dir=CACHE_DIR, model_ver=None, data_ver=None):
+    """Score the insights dataset, reusing cached scores for this model version.
+
+    Scores are stored under ``cache_dir`` as ``risk_scores_<model>_<data>.csv``
+    together with a hash of each scored row; the data version lives in the
+    name of the atomically replaced file, so it always matches the scores. When
+    the data changes, rows whose ``encounter_id`` and row hash are in the latest
+    cache for this model are reused and only new or edited rows are run through
+    the model. Returns ``insights_df`` with ``risk_probability`` and
+    ``risk_band`` columns added.
+    """
+    model_ver = model_ver or model_version(model)
+    data_ver = data_ver or data_version(insights_df)
+    prefix = f"risk_scores_{model_ver}_"
+    path = os.path.join(cache_dir, f"{prefix}{data_ver}.csv")
+    score_columns = ['encounter_id', 'risk_probability', 'risk_band']
+
+    cached = _read_cache(path) if os.path.exists(path) else None
+    if cached is not None:
+        return insights_df.merge(cached[score_columns], on='encounter_id', how='left')
+
+    previous = sorted(glob.glob(os.path.join(glob.escape(cache_dir), f"{glob.escape(prefix)}*.csv")), key=_mtime_or_zero)
+    cached = _read_cache(previous[-1]) if previous else None
+
+    current = pd.DataFrame({
+        'encounter_id': insights_df['encounter_id'].to_numpy(),
+        'row_hash': row_hashes(insights_df),
+    })
+    stale = np.ones(len(insights_df), dtype=bool)
+    scores = None
+    if cached is not None:
+        # Keep cached scores only for rows that are unchanged since they were scored
+        scores = current.merge(cached, on=['encounter_id', 'row_hash'], how='inner')
+        stale = ~insights_df['encounter_id'].isin(scores['encounter_id']).to_numpy()
+
+    if stale.any():
+        fresh = score_encounters(model, insights_df[stale])
+        fresh.insert(1, 'row_hash', current['row_hash'].to_numpy()[stale])
+        scores = fresh if scores is None else pd.concat([scores, fresh], ignore_index=True)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    replace_atomic(path, lambda tmp: scores.to_csv(tmp, index=False))
+    for old_path in previous:
+        if old_path != path:
+            remove_quietly(old_path)
+
+    return insights_df.merge(scores[score_columns], on='encounter_id', how='left')
+
+
+def high_risk_rate(scored_df, by):
+    """Share of encounters in the High band and mean probability per group."""
+    grouped = scored_df.assign(high=scored_df['risk_band'] == "High").groupby(by)
+    return pd.DataFrame({
+        'encounters': grouped.size(),
+        'high_risk_pct': grouped['high'].mean() * 100,
+        'mean_probability': grouped['risk_probability'].mean(),
+    }).reset_index()
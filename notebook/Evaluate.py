@@ -1,27 +1,64 @@
+import os
+import argparse
 import pandas as pd
-from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
 import joblib
 import warnings
+from evaluation import APP_THRESHOLDS, evaluate, write_report
 warnings.filterwarnings("ignore", category=UserWarning)
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser(description="Evaluate a readmission model on a holdout set.")
+parser.add_argument("--model", default=os.path.join(BASE_DIR, "diabetes_readmission.pkl"))
+parser.add_argument("--data", default=os.path.join(BASE_DIR, "..", "datasets", "diabetes_data_ml.csv"))
+parser.add_argument("--target", default="readmitted")
+parser.add_argument("--test-size", type=float, default=0.3,
+                    help="holdout fraction; use 1.0 to evaluate on the whole dataset")
+parser.add_argument("--random-state", type=int, default=1)
+parser.add_argument("--bootstrap", type=int, default=1000, help="bootstrap rounds (0 disables CIs)")
+parser.add_argument("--jobs", type=int, default=-1)
+parser.add_argument("--out", default=os.path.join(BASE_DIR, "evaluation_report"))
+args = parser.parse_args()
+
 # 1. Load dataset
-data = pd.read_csv(r"c:\diabetes_analysis_project\datasets\diabetes_data_ml.csv")   # adjust path/filename
+data = pd.read_csv(args.data)
 print(f'model features length {len(data.columns)}')
 # 2. Split features/target
-X = data.drop("readmitted", axis=1)   # replace "readmitted" with your actual target column
-y = data["readmitted"]
+X = data.drop(args.target, axis=1)
+X = X.astype({c: 'int64' for c in X.select_dtypes('bool').columns})
+y = data[args.target]
 
-# 3. Train/test split (same random_state used during training)
-from sklearn.model_selection import train_test_split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+# 3. Train/test split (ml_model.ipynb trained on test_size=0.30, random_state=1)
+if args.test_size < 1.0:
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, random_state=args.random_state
+    )
+else:
+    X_test, y_test = X, y
 
 # 4. Load trained model
-model = joblib.load(r"c:\diabetes_analysis_project\notebook\diabetes_readmission.pkl")   # adjust path
-# 5. Predict
-y_pred = model.predict(X_test)
+model = joblib.load(args.model)
+# 5. Predict (scores only; every metric comes from the sorted-score engine)
+y_prob = model.predict_proba(X_test)[:, 1]
 
 # 6. Evaluate
-accuracy = accuracy_score(y_test, y_pred)
-print(f"Model accuracy: {accuracy:.2f}")
+report, curves = evaluate(y_test, y_prob, n_bootstrap=args.bootstrap, n_jobs=args.jobs,
+                          random_state=args.random_state)
+report['model'] = os.path.abspath(args.model)
+report['data'] = os.path.abspath(args.data)
+write_report(report, curves, args.out)
+
+ci = report.get('ci', {})
+def fmt(name):
+    value = report['metrics'][name]
+    return f"{value:.3f} [{ci[name][0]:.3f}, {ci[name][1]:.3f}]" if name in ci else f"{value:.3f}"
+
+print(f"Model accuracy (predict, >0.5): {fmt('accuracy@0.5')}")
+print(f"ROC AUC: {fmt('auc')}")
+print(f"Average precision: {fmt('average_precision')}")
+print(f"Brier score: {fmt('brier')}  ECE: {fmt('ece')}")
+for t, inclusive in APP_THRESHOLDS:
+    print(f"{'>=' if inclusive else '>'}{t}: accuracy {fmt(f'accuracy@{t}')}, precision {fmt(f'precision@{t}')}, "
+          f"recall {fmt(f'recall@{t}')}, flagged {fmt(f'flagged_rate@{t}')}")
+print(f"Report written to {args.out}.json and {args.out}_curves.csv")
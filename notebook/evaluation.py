@@ -0,0 +1,177 @@
+import json
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# Cutoffs used by Streamlit/interface.py as (threshold, inclusive) pairs: risk bands flag
+# probability >= 0.3/0.7, recommendations flag probability > 0.4/0.6 and predict()
+# flags probability > 0.5
+APP_THRESHOLDS = [(0.3, True), (0.4, False), (0.5, False), (0.6, False), (0.7, True)]
+
+
+def _as_operating_point(threshold):
+    """Bare floats are inclusive (flag scores >= threshold)."""
+    return threshold if isinstance(threshold, tuple) else (threshold, True)
+
+
+def _safe_div(num, den):
+    num = np.asarray(num, dtype='float64')
+    den = np.asarray(den, dtype='float64')
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den > 0)
+
+
+class SortedScores:
+    """Scores sorted once (descending) so every threshold metric is a cumulative sum.
+
+    Bootstrap replicates reuse the same order by weighting each row with its
+    resample count instead of re-sorting.
+    """
+
+    def __init__(self, y_true, y_score, n_bins=10):
+        y_true = np.asarray(y_true).astype('float64')
+        y_score = np.asarray(y_score, dtype='float64')
+        order = np.argsort(-y_score, kind='mergesort')
+        self.y = y_true[order]
+        self.scores = y_score[order]
+        self.n = len(self.scores)
+        # Last row of each run of tied scores, i.e. one entry per distinct threshold
+        self.boundaries = np.r_[np.flatnonzero(np.diff(self.scores)), self.n - 1]
+        self.thresholds = self.scores[self.boundaries]
+        self.n_bins = n_bins
+        self.bin_idx = np.clip((self.scores * n_bins).astype('int64'), 0, n_bins - 1)
+
+    def counts(self, weights=None):
+        """Cumulative true/false positives at every distinct threshold."""
+        pos = self.y if weights is None else weights * self.y
+        neg = (1 - self.y) if weights is None else weights * (1 - self.y)
+        tp = np.cumsum(pos)[self.boundaries]
+        fp = np.cumsum(neg)[self.boundaries]
+        return tp, fp
+
+    def metrics(self, thresholds=APP_THRESHOLDS, weights=None):
+        """Scalar metrics: AUC, average precision, Brier, ECE and operating points."""
+        tp, fp = self.counts(weights)
+        P, N = tp[-1], fp[-1]
+        tpr = _safe_div(tp, P)
+        fpr = _safe_div(fp, N)
+        precision = _safe_div(tp, tp + fp)
+
+        tpr0, fpr0 = np.r_[0, tpr], np.r_[0, fpr]
+        out = {
+            'auc': float(np.sum(np.diff(fpr0) * (tpr0[1:] + tpr0[:-1]) / 2)),
+            'average_precision': float(np.sum(np.diff(tpr0) * precision)),
+        }
+        out.update(self._calibration_summary(weights))
+        for t, inclusive in map(_as_operating_point, thresholds):
+            point = self._operating_point(tp, fp, P, N, t, inclusive)
+            out.update({f"{k}@{t}": v for k, v in point.items()})
+        return out
+
+    def _operating_point(self, tp, fp, P, N, threshold, inclusive=True):
+        """Confusion-matrix metrics when flagging scores >= threshold (> if not inclusive)."""
+        k = np.searchsorted(-self.thresholds, -threshold, side='right' if inclusive else 'left')
+        tp_t = tp[k - 1] if k > 0 else 0.0
+        fp_t = fp[k - 1] if k > 0 else 0.0
+        precision = float(_safe_div(tp_t, tp_t + fp_t))
+        recall = float(_safe_div(tp_t, P))
+        return {
+            'accuracy': float(_safe_div(tp_t + N - fp_t, P + N)),
+            'precision': precision,
+            'recall': recall,
+            'specificity': float(_safe_div(N - fp_t, N)),
+            'f1': float(_safe_div(2 * precision * recall, precision + recall)),
+            'flagged_rate': float(_safe_div(tp_t + fp_t, P + N)),
+        }
+
+    def _bin_sums(self, w):
+        count = np.bincount(self.bin_idx, weights=w, minlength=self.n_bins)
+        pred = np.bincount(self.bin_idx, weights=w * self.scores, minlength=self.n_bins)
+        obs = np.bincount(self.bin_idx, weights=w * self.y, minlength=self.n_bins)
+        return count, _safe_div(pred, count), _safe_div(obs, count)
+
+    def calibration(self, weights=None):
+        """Equal-width calibration bins: count, mean predicted and observed rate."""
+        count, mean_predicted, observed_rate = self._bin_sums(np.ones(self.n) if weights is None else weights)
+        edges = np.linspace(0, 1, self.n_bins + 1)
+        return pd.DataFrame({
+            'bin_lower': edges[:-1],
+            'bin_upper': edges[1:],
+            'count': count,
+            'mean_predicted': mean_predicted,
+            'observed_rate': observed_rate,
+        })
+
+    def _calibration_summary(self, weights=None):
+        w = np.ones(self.n) if weights is None else weights
+        count, mean_predicted, observed_rate = self._bin_sums(w)
+        return {
+            'brier': float(_safe_div(np.dot(w, (self.scores - self.y) ** 2), count.sum())),
+            'ece': float(_safe_div(np.dot(count, np.abs(mean_predicted - observed_rate)), count.sum())),
+        }
+
+    def curves(self):
+        """ROC/PR curves and the full confusion matrix at every distinct threshold."""
+        tp, fp = self.counts()
+        P, N = tp[-1], fp[-1]
+        return pd.DataFrame({
+            'threshold': self.thresholds,
+            'tp': tp, 'fp': fp, 'fn': P - tp, 'tn': N - fp,
+            'tpr': _safe_div(tp, P),
+            'fpr': _safe_div(fp, N),
+            'precision': _safe_div(tp, tp + fp),
+        })
+
+
+def _bootstrap_chunk(sorted_scores, thresholds, seed, n_rounds):
+    rng = np.random.default_rng(seed)
+    n = sorted_scores.n
+    results = []
+    for _ in range(n_rounds):
+        weights = np.bincount(rng.integers(0, n, n), minlength=n).astype('float64')
+        results.append(sorted_scores.metrics(thresholds, weights))
+    return results
+
+
+def bootstrap_ci(sorted_scores, thresholds=APP_THRESHOLDS, n_bootstrap=1000, confidence=0.95,
+                 n_jobs=-1, random_state=0):
+    """Percentile bootstrap confidence intervals, with replicates split across workers."""
+    n_chunks = max(1, min(n_bootstrap, 4 * (n_jobs if n_jobs > 0 else 8)))
+    sizes = [len(c) for c in np.array_split(np.arange(n_bootstrap), n_chunks) if len(c)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+    chunks = Parallel(n_jobs=n_jobs)(
+        delayed(_bootstrap_chunk)(sorted_scores, thresholds, seed, size)
+        for seed, size in zip(seeds, sizes)
+    )
+    samples = pd.DataFrame([r for chunk in chunks for r in chunk])
+    alpha = (1 - confidence) / 2
+    return {
+        name: [float(samples[name].quantile(alpha)), float(samples[name].quantile(1 - alpha))]
+        for name in samples.columns
+    }
+
+
+def evaluate(y_true, y_score, thresholds=APP_THRESHOLDS, n_bins=10, n_bootstrap=1000,
+             confidence=0.95, n_jobs=-1, random_state=0):
+    """Evaluate predicted probabilities; returns (report dict, curves DataFrame)."""
+    sorted_scores = SortedScores(y_true, y_score, n_bins=n_bins)
+    report = {
+        'n': int(sorted_scores.n),
+        'positives': int(sorted_scores.y.sum()),
+        'metrics': sorted_scores.metrics(thresholds),
+        'operating_points': {str(t): ">=" if inclusive else ">"
+                             for t, inclusive in map(_as_operating_point, thresholds)},
+        'calibration': sorted_scores.calibration().to_dict(orient='records'),
+    }
+    if n_bootstrap:
+        report['confidence'] = confidence
+        report['n_bootstrap'] = n_bootstrap
+        report['ci'] = bootstrap_ci(sorted_scores, thresholds, n_bootstrap, confidence,
+                                    n_jobs, random_state)
+    return report, sorted_scores.curves()
+
+
+def write_report(report, curves, out_prefix):
+    """Write <prefix>.json (summary, calibration, CIs) and <prefix>_curves.csv."""
+    with open(f"{out_prefix}.json", "w") as f:
+        json.dump(report, f, indent=2)
+    curves.to_csv(f"{out_prefix}_curves.csv", index=False)
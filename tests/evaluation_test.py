@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+import numpy as np
+from sklearn.metrics import accuracy_score, roc_auc_score, average_precision_score, brier_score_loss, precision_score, recall_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "notebook"))
+from evaluation import APP_THRESHOLDS, SortedScores, evaluate
+
+
+class TestEvaluation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.y = rng.integers(0, 2, 2000)
+        # Rounded scores so that ties are exercised
+        self.p = np.round(np.clip(0.3 * self.y + rng.random(2000) * 0.7, 0, 1), 2)
+
+    def test_metrics_match_sklearn(self):
+        m = SortedScores(self.y, self.p).metrics()
+        self.assertAlmostEqual(m['auc'], roc_auc_score(self.y, self.p))
+        self.assertAlmostEqual(m['average_precision'], average_precision_score(self.y, self.p))
+        self.assertAlmostEqual(m['brier'], brier_score_loss(self.y, self.p))
+        for t, inclusive in APP_THRESHOLDS:
+            pred = (self.p >= t if inclusive else self.p > t).astype(int)
+            self.assertAlmostEqual(m[f'precision@{t}'], precision_score(self.y, pred))
+            self.assertAlmostEqual(m[f'recall@{t}'], recall_score(self.y, pred))
+            self.assertAlmostEqual(m[f'accuracy@{t}'], accuracy_score(self.y, pred))
+
+    def test_strict_and_inclusive_thresholds(self):
+        scores = SortedScores(self.y, self.p)
+        inclusive = scores.metrics(thresholds=[0.4])
+        strict = scores.metrics(thresholds=[(0.4, False)])
+        self.assertAlmostEqual(inclusive['flagged_rate@0.4'], np.mean(self.p >= 0.4))
+        self.assertAlmostEqual(strict['flagged_rate@0.4'], np.mean(self.p > 0.4))
+        self.assertGreater(inclusive['flagged_rate@0.4'], strict['flagged_rate@0.4'])
+
+    def test_curves_confusion_totals(self):
+        curves = SortedScores(self.y, self.p).curves()
+        self.assertEqual(len(curves), len(np.unique(self.p)))
+        totals = curves[['tp', 'fp', 'fn', 'tn']].sum(axis=1)
+        self.assertTrue((totals == len(self.y)).all())
+
+    def test_calibration_bins(self):
+        bins = SortedScores(self.y, self.p, n_bins=5).calibration()
+        self.assertEqual(len(bins), 5)
+        self.assertEqual(bins['count'].sum(), len(self.y))
+
+    def test_bootstrap_ci_brackets_estimate(self):
+        report, _ = evaluate(self.y, self.p, n_bootstrap=40, n_jobs=2)
+        low, high = report['ci']['auc']
+        self.assertLessEqual(low, report['metrics']['auc'])
+        self.assertGreaterEqual(high, report['metrics']['auc'])
+        again, _ = evaluate(self.y, self.p, n_bootstrap=40, n_jobs=2)
+        self.assertEqual(report['ci'], again['ci'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Streamlit"))
+from model_registry import ModelRegistry, shadow_compare
+
+
+def fit_model(seed):
+    rng = np.random.default_rng(seed)
+    X = rng.random((200, 3))
+    y = (X[:, 0] + rng.random(200) * 0.5 > 0.7).astype(int)
+    return LogisticRegression().fit(X, y), X
+
+
+def _log_rows(root, worker):
+    comparison = shadow_compare(_ConstantModel(), np.zeros((50, 3)), np.full(50, 0.2), "v1", f"w{worker}")
+    ModelRegistry(root).log_shadow(comparison)
+
+
+class _ConstantModel:
+    def predict_proba(self, X):
+        return np.tile([0.7, 0.3], (len(X), 1))
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_register_assigns_versions_and_metadata(self):
+        model, _ = fit_model(0)
+        self.assertEqual(self.registry.register(model, metrics={"auc": 0.6}), "v1")
+        self.assertEqual(self.registry.register(model, metadata={"note": "retrain"}), "v2")
+        self.assertEqual(self.registry.list_versions(), ["v1", "v2"])
+        self.assertEqual(self.registry.metadata("v1")["metrics"], {"auc": 0.6})
+        self.assertEqual(self.registry.metadata("v2")["note"], "retrain")
+        self.assertIsNone(self.registry.live_version())
+
+    def test_load_memory_maps_arrays(self):
+        model, X = fit_model(0)
+        self.registry.register(model)
+        loaded = self.registry.load("v1")
+        self.assertIsInstance(loaded.coef_, np.memmap)
+        np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X))
+
+    def test_promote_and_shadow(self):
+        live, X = fit_model(0)
+        candidate, _ = fit_model(1)
+        self.registry.promote(self.registry.register(live))
+        self.registry.set_shadow(self.registry.register(candidate))
+        self.assertEqual(self.registry.live_version(), "v1")
+        self.assertEqual(self.registry.shadow_version(), "v2")
+
+        live_probability = self.registry.load("v1").predict_proba(X[:5])[:, 1]
+        comparison = shadow_compare(self.registry.load("v2"), X[:5], live_probability, "v1", "v2")
+        np.testing.assert_allclose(comparison["difference"],
+                                   candidate.predict_proba(X[:5])[:, 1] - live.predict_proba(X[:5])[:, 1])
+        self.registry.log_shadow(comparison)
+        self.registry.log_shadow(comparison)
+        with open(os.path.join(self.tmp.name, "shadow_log.csv")) as f:
+            self.assertEqual(len(f.readlines()), 11)
+
+        self.registry.promote("v2")
+        self.assertEqual(self.registry.live_version(), "v2")
+        self.assertIsNone(self.registry.shadow_version())
+
+    def test_shadow_log_from_several_processes(self):
+        from multiprocessing import Pool
+        with Pool(4) as pool:
+            pool.starmap(_log_rows, [(self.tmp.name, i) for i in range(8)])
+        with open(os.path.join(self.tmp.name, "shadow_log.csv")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0].split(",")[0], "scored_at")
+        self.assertEqual(len(lines), 1 + 8 * 50)
+        self.assertTrue(all(len(line.split(",")) == 6 for line in lines))
+
+    def test_shadow_log_from_several_threads(self):
+        # Streamlit sessions are threads sharing one PID
+        from threading import Barrier, Thread
+        barrier = Barrier(8)
+        errors = []
+        def log(worker):
+            barrier.wait()
+            try:
+                _log_rows(self.tmp.name, worker)
+            except Exception as e:
+                errors.append(e)
+        threads = [Thread(target=log, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        with open(os.path.join(self.tmp.name, "shadow_log.csv")) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0].split(",")[0], "scored_at")
+        self.assertEqual(len(lines), 1 + 8 * 50)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["shadow_log.csv"])
+
+    def test_reserved_metadata_rejected(self):
+        model, _ = fit_model(0)
+        with self.assertRaises(ValueError):
+            self.registry.register(model, metadata={"sha256": "0" * 64})
+        self.assertEqual(self.registry.list_versions(), [])
+
+    def test_seed_rejects_non_model(self):
+        with self.assertRaises(TypeError):
+            self.registry.seed(lambda: {"not": "a model"})
+        self.assertIsNone(self.registry.live_version())
+        self.assertEqual(self.registry.list_versions(), [])
+        model, _ = fit_model(0)
+        self.assertEqual(self.registry.seed(lambda: model), "v1")
+
+    def test_seed_runs_once(self):
+        model, _ = fit_model(0)
+        calls = []
+        def fetch():
+            calls.append(1)
+            return model
+        self.assertEqual(self.registry.seed(fetch), "v1")
+        self.assertEqual(self.registry.seed(fetch), "v1")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.registry.list_versions(), ["v1"])
+
+    def test_seed_skipped_while_locked(self):
+        model, _ = fit_model(0)
+        open(os.path.join(self.tmp.name, "SEED.lock"), "w").close()
+        self.assertIsNone(self.registry.seed(lambda: model))
+        self.assertEqual(self.registry.list_versions(), [])
+
+    def test_promote_unknown_version(self):
+        with self.assertRaises(ValueError):
+            self.registry.promote("v9")
+
+
+if __name__ == "__main__":
+    unittest.main()
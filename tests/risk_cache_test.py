@@ -0,0 +1,127 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Streamlit"))
+from risk_cache import MODEL_FEATURES, encode_features, risk_band, load_risk_scores, data_version, high_risk_rate
+
+
+class CountingModel:
+    """Stand-in model that scores by age and records how many rows it saw."""
+    def __init__(self):
+        self.rows_scored = 0
+
+    def predict_proba(self, X):
+        self.rows_scored += len(X)
+        p = X['age'].to_numpy() / 100
+        return np.column_stack([1 - p, p])
+
+
+def make_insights(n, start=0):
+    ages = ['[20-30)', '[50-60)', '[80-90)']
+    return pd.DataFrame({
+        'encounter_id': np.arange(start, start + n),
+        'patient_nbr': np.arange(start, start + n),
+        'race': 'Caucasian',
+        'gender': ['Male', 'Female'] * (n // 2) + ['Male'] * (n % 2),
+        'age': [ages[i % 3] for i in range(n)],
+        'admission_type_id': 'Emergency',
+        'discharge_disposition_id': 'Discharged to home',
+        'admission_source_id': 'Referral',
+        'time_in_hospital': 3,
+        'payer_code': 'MC',
+        'num_lab_procedures': 40,
+        'num_procedures': 1,
+        'num_medications': 15,
+        'diag_1': 'Circulatory',
+        'diag_2': 'Diabetes',
+        'diag_3': 'Other',
+        'number_diagnoses': 7,
+        'insulin': 'No',
+        'change': 'No',
+        'diabetesMed': 'Yes',
+        'readmitted': 'NO',
+        'total_visits': 0,
+    })
+
+
+class TestRiskCache(unittest.TestCase):
+    def test_encode_features_matches_model_columns(self):
+        X = encode_features(make_insights(4))
+        self.assertEqual(list(X.columns), MODEL_FEATURES)
+        self.assertEqual(X['age'].tolist(), [25, 55, 85, 25])
+        self.assertEqual(X['gender'].tolist(), [1, 0, 1, 0])
+        self.assertTrue((X['diag_2_Diabetes'] == 1).all())
+        # Baseline levels (e.g. Circulatory) have no column of their own
+        self.assertTrue((X.filter(like='diag_1_') == 0).all().all())
+
+    def test_risk_band_cutoffs(self):
+        self.assertEqual(risk_band(0.29), "Low")
+        self.assertEqual(risk_band(0.3), "Medium")
+        self.assertEqual(risk_band(0.69), "Medium")
+        self.assertEqual(risk_band(0.7), "High")
+
+    def test_scores_reused_and_extended_incrementally(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            model = CountingModel()
+            df = make_insights(6)
+            scored = load_risk_scores(model, df, cache_dir=cache_dir, model_ver="m1")
+            self.assertEqual(model.rows_scored, 6)
+            self.assertEqual(scored['risk_band'].tolist(), ["Low", "Medium", "High"] * 2)
+
+            load_risk_scores(model, df, cache_dir=cache_dir, model_ver="m1")
+            self.assertEqual(model.rows_scored, 6)
+
+            grown = pd.concat([df, make_insights(3, start=6)], ignore_index=True)
+            scored = load_risk_scores(model, grown, cache_dir=cache_dir, model_ver="m1")
+            self.assertEqual(model.rows_scored, 9)
+            self.assertFalse(scored['risk_probability'].isna().any())
+
+            load_risk_scores(model, grown, cache_dir=cache_dir, model_ver="m2")
+            self.assertEqual(model.rows_scored, 18)
+
+    def test_edited_rows_rescored(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            model = CountingModel()
+            df = make_insights(6)
+            load_risk_scores(model, df, cache_dir=cache_dir, model_ver="m1")
+
+            edited = df.copy()
+            edited.loc[0, 'age'] = '[80-90)'
+            scored = load_risk_scores(model, edited, cache_dir=cache_dir, model_ver="m1")
+            self.assertEqual(model.rows_scored, 7)
+            self.assertEqual(scored.loc[0, 'risk_band'], "High")
+            self.assertAlmostEqual(scored.loc[0, 'risk_probability'], 0.85)
+            self.assertEqual(len(scored), 6)
+
+    def test_cache_file_carries_data_version(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            model = CountingModel()
+            df = make_insights(6)
+            load_risk_scores(model, df, cache_dir=cache_dir, model_ver="m1")
+            grown = pd.concat([df, make_insights(3, start=6)], ignore_index=True)
+            load_risk_scores(model, grown, cache_dir=cache_dir, model_ver="m1")
+            self.assertEqual(os.listdir(cache_dir), [f"risk_scores_m1_{data_version(grown)}.csv"])
+
+            # Going back to the old data reuses unchanged rows from the latest cache
+            scored = load_risk_scores(model, df, cache_dir=cache_dir, model_ver="m1")
+            self.assertEqual(model.rows_scored, 9)
+            self.assertFalse(scored['risk_probability'].isna().any())
+            self.assertEqual(os.listdir(cache_dir), [f"risk_scores_m1_{data_version(df)}.csv"])
+
+    def test_high_risk_rate(self):
+        scored = pd.DataFrame({
+            'age': ['a', 'a', 'b'],
+            'risk_band': ['High', 'Low', 'Low'],
+            'risk_probability': [0.8, 0.2, 0.1],
+        })
+        rates = high_risk_rate(scored, 'age').set_index('age')
+        self.assertEqual(rates.loc['a', 'high_risk_pct'], 50)
+        self.assertEqual(rates.loc['b', 'encounters'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()